@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Long-lived A-mem process for the test scripts.
+
+Builds one AgenticMemorySystem (and loads the embedding model) once, then
+serves it over a Unix socket. With AMEM_DAEMON=1 set, create_memory_system()
+in the scripts returns a DaemonClient instead of paying the model load
+again on every run. Notes live as long as the daemon does, so they carry
+over from one script run to the next.
+
+Protocol: one JSON object per line in each direction.
+  request:  {"op": "config" | "add_note" | "add_notes_batch" |
+                   "search_agentic" | "search_agentic_batch" | "read", ...}
+  response: {"ok": true, "result": ...} or {"ok": false, "error": "..."}
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+
+SOCKET_PATH = os.getenv('AMEM_DAEMON_SOCKET', os.path.expanduser('~/.cache/amem-daemon.sock'))
+
+
+def daemon_config(model_name, llm_backend, llm_model):
+    """The settings a client and the daemon must agree on, with the model as a repo id."""
+    if '/' not in model_name:
+        model_name = f'sentence-transformers/{model_name}'
+    return {'model_name': model_name, 'llm_backend': llm_backend, 'llm_model': llm_model}
+
+
+class DaemonClient:
+    """AgenticMemorySystem stand-in that forwards calls to a running daemon."""
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._file = sock.makefile('rwb')
+
+    def _call(self, op, **params):
+        self._file.write(json.dumps({'op': op, **params}).encode() + b'\n')
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("A-mem daemon closed the connection")
+        reply = json.loads(line)
+        if not reply.get('ok'):
+            raise RuntimeError(reply.get('error', 'daemon request failed'))
+        return reply['result']
+
+    def config(self):
+        return self._call('config')
+
+    def add_note(self, content, **kwargs):
+        return self._call('add_note', content=content, **kwargs)
+
+    def add_notes_batch(self, contents, tags_list):
+        from amem_embeddings import BatchAddError
+
+        result = self._call(
+            'add_notes_batch',
+            contents=list(contents),
+            tags_list=[list(tags) for tags in tags_list],
+        )
+        if result['errors'] is not None:
+            raise BatchAddError(result['memory_ids'], result['errors'])
+        return result['memory_ids']
+
+    def search_agentic(self, query, k=5):
+        return self._call('search_agentic', query=query, k=k)
+
+    def search_agentic_batch(self, queries, k=5):
+        return self._call('search_agentic_batch', queries=list(queries), k=k)
+
+    def read(self, memory_id):
+        return self._call('read', memory_id=memory_id)
+
+
+def connect(path=SOCKET_PATH, config=None):
+    """
+    Return a DaemonClient if a daemon is listening on path, else None.
+
+    When config is given (see daemon_config()), raises RuntimeError if the
+    daemon was started with different settings.
+    """
+    if not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        return None
+
+    client = DaemonClient(sock)
+    if config is not None:
+        served = client.config()
+        if served != config:
+            client._file.close()
+            sock.close()
+            raise RuntimeError(f"A-mem daemon on {path} serves {served}, not {config}")
+    return client
+
+
+def _dispatch(memory_system, config, request):
+    from amem_embeddings import BatchAddError, add_notes_batch, search_agentic_batch
+
+    op = request.pop('op', None)
+    if op == 'config':
+        return config
+    if op == 'add_note':
+        return memory_system.add_note(**request)
+    if op == 'add_notes_batch':
+        # Partial failures travel back with the ids that were added
+        try:
+            memory_ids = add_notes_batch(memory_system, request['contents'], request['tags_list'])
+        except BatchAddError as e:
+            return {'memory_ids': e.memory_ids, 'errors': e.errors}
+        return {'memory_ids': memory_ids, 'errors': None}
+    if op == 'search_agentic':
+        return memory_system.search_agentic(request['query'], k=request.get('k', 5))
+    if op == 'search_agentic_batch':
+        return search_agentic_batch(memory_system, request['queries'], k=request.get('k', 5))
+    if op == 'read':
+        note = memory_system.read(request['memory_id'])
+        return note if note is None or isinstance(note, dict) else vars(note)
+    raise ValueError(f"unknown op: {op!r}")
+
+
+def serve(memory_system, config, path=SOCKET_PATH):
+    """Serve memory_system, built with config, on a Unix socket until interrupted."""
+
+    # Each client gets a thread, so a second script is not stuck behind the
+    # first one's open connection; A-mem is not thread-safe, so requests
+    # still run one at a time
+    lock = threading.Lock()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            # One connection stays open for a whole script run
+            for line in self.rfile:
+                try:
+                    with lock:
+                        result = _dispatch(memory_system, config, json.loads(line))
+                    reply = {'ok': True, 'result': result}
+                except Exception as e:
+                    reply = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+                self.wfile.write(json.dumps(reply, default=str).encode() + b'\n')
+                self.wfile.flush()
+
+    if os.path.exists(path):
+        os.remove(path)  # stale socket from a previous run
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with socketserver.ThreadingUnixStreamServer(path, Handler) as server:
+        server.daemon_threads = True
+        try:
+            server.serve_forever()
+        finally:
+            os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve one warm A-mem instance over a Unix socket")
+    parser.add_argument('--socket', default=SOCKET_PATH)
+    parser.add_argument('--model', default='sentence-transformers/all-MiniLM-L6-v2')
+    parser.add_argument('--llm-backend', default='ollama')
+    parser.add_argument('--llm-model', default=os.getenv('OLLAMA_MODEL', 'llama3.2'))
+    parser.add_argument('--no-vector-index', dest='vector_index', action='store_false',
+                        help="rank searches with Chroma's own index instead of the int8 one")
+    args = parser.parse_args()
+
+    client = connect(args.socket)
+    if client is not None:
+        print(f"❌ A-mem daemon already running on {args.socket}")
+        sys.exit(1)
+
+    os.environ.pop('AMEM_DAEMON', None)  # build the instance here, not via a client
+    os.environ.setdefault('HF_HUB_DISABLE_IMPLICIT_TOKEN', '1')
+    os.environ.setdefault('OLLAMA_HOST', 'http://localhost:11434')
+
+    from amem_embeddings import create_memory_system
+
+    print("🧠 Starting A-mem daemon...")
+    memory_system = create_memory_system(
+        model_name=args.model,
+        llm_backend=args.llm_backend,
+        llm_model=args.llm_model,
+        vector_index=args.vector_index,
+    )
+    print(f"✅ A-mem ready ({args.llm_backend}/{args.llm_model}, {args.model})")
+    print(f"   Listening on {args.socket}; set AMEM_DAEMON=1 in the scripts to use it")
+
+    try:
+        serve(memory_system, daemon_config(args.model, args.llm_backend, args.llm_model), args.socket)
+    except KeyboardInterrupt:
+        print("\n👋 A-mem daemon stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,569 @@
+"""
+Shared embedding helpers for the A-mem scripts.
+
+A-mem embeds every note on its own as it is added. These helpers encode a
+whole batch of contents in one forward pass and serve the vectors back to
+A-mem's retriever, so inserting N notes costs one encode instead of N.
+"""
+
+import asyncio
+import atexit
+import collections
+import functools
+import os
+
+DEFAULT_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+ENCODE_BATCH_SIZE = 64
+GPU_ENCODE_BATCH_SIZE = 128
+# What SentenceTransformer (and the ONNX export, which converts the
+# safetensors weights itself) needs; skips the repo's TF, Rust, ONNX and
+# OpenVINO copies of the same weights
+MODEL_FILES = [
+    'modules.json',
+    'config.json',
+    'config_sentence_transformers.json',
+    'sentence_bert_config.json',
+    'tokenizer.json',
+    'tokenizer_config.json',
+    'special_tokens_map.json',
+    'vocab.txt',
+    'model.safetensors',
+    '1_Pooling/config.json',
+]
+# Faster first pull through hf_xet, unless already set in the environment
+XET_SETTINGS = {
+    'HF_XET_HIGH_PERFORMANCE': True,
+    'HF_XET_NUM_CONCURRENT_RANGE_GETS': 64,
+}
+# Texts kept by CachedEmbeddingFunction; far more than one batch needs
+CACHE_SIZE = 4096
+# Below this many texts, worker start-up costs more than it saves
+MULTI_PROCESS_THRESHOLD = 256
+# Stored embeddings read from Chroma per request when filling the index
+INDEX_FILL_BATCH = 4096
+# Saved int8 index, next to Chroma's files in A-mem's storage_path
+INDEX_DIR = 'int8_index'
+
+
+def require_amem():
+    """
+    Raise ImportError unless the A-mem package is installed, without
+    importing it: that loads torch, which create_memory_system() defers.
+    """
+    import importlib.util
+
+    if importlib.util.find_spec('agentic_memory') is None:
+        raise ImportError("No module named 'agentic_memory'")
+
+
+@functools.lru_cache(maxsize=None)
+def default_device():
+    """Return 'cuda' or 'mps' when torch can see a GPU, otherwise 'cpu'."""
+    try:
+        import torch
+    except ImportError:
+        return 'cpu'
+    if torch.cuda.is_available():
+        return 'cuda'
+    if torch.backends.mps.is_available():
+        return 'mps'
+    return 'cpu'
+
+
+@functools.lru_cache(maxsize=None)
+def configure_torch():
+    """
+    Apply inference-only torch settings once, before the first model load.
+
+    Nothing here trains, so autograd tracking is switched off (for the
+    calling thread, where the scripts encode). Intra-op threads use every
+    core and inter-op parallelism is pinned to one thread so the two pools
+    don't oversubscribe the CPU.
+    """
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_grad_enabled(False)
+    torch.set_num_threads(os.cpu_count() or 1)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # only allowed before any inter-op work has started
+
+
+class OnnxEmbedder:
+    """
+    SentenceTransformer-style wrapper around fast-sentence-transformers,
+    which exports the model to ONNX Runtime and INT8-quantizes it on load.
+    """
+
+    device = 'cpu'
+
+    def __init__(self, model_path):
+        from fast_sentence_transformers import FastSentenceTransformer
+
+        self.model = FastSentenceTransformer(model_path, device='cpu')
+
+    def encode(self, sentences, batch_size=ENCODE_BATCH_SIZE, normalize_embeddings=False, **kwargs):
+        """Encode like SentenceTransformer.encode, always returning numpy arrays."""
+        import numpy as np
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            chunk = texts[start:start + batch_size]
+            batches.append(np.asarray(self.model.encode(chunk), dtype=np.float32).reshape(len(chunk), -1))
+        vectors = np.concatenate(batches) if batches else np.empty((0, 0), dtype=np.float32)
+        if normalize_embeddings and len(vectors):
+            vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
+
+
+class OllamaEmbedder:
+    """SentenceTransformer-style wrapper that embeds through Ollama's /api/embed."""
+
+    device = 'cpu'
+
+    def __init__(self, model):
+        self.model = model
+
+    def encode(self, sentences, **kwargs):
+        """Encode like SentenceTransformer.encode; batching follows OLLAMA_EMBED_BATCH_SIZE."""
+        import numpy as np
+        from ollama_client import embed
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        vectors = np.asarray(embed(texts, self.model), dtype=np.float32)
+        # The legacy per-text endpoint does not normalize its output
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
+
+
+class TeiEmbedder:
+    """
+    SentenceTransformer-style wrapper around a Text Embeddings Inference
+    server (see scripts/run-tei.sh), which batches and pads server-side.
+    """
+
+    device = 'cpu'
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+
+    def encode(self, sentences, batch_size=ENCODE_BATCH_SIZE, **kwargs):
+        """Encode like SentenceTransformer.encode; TEI normalizes by default."""
+        import numpy as np
+        from http_client import get_client
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        vectors = []
+        for start in range(0, len(texts), batch_size):
+            response = get_client().post(
+                f"{self.url}/embed",
+                json={"inputs": texts[start:start + batch_size]},
+            )
+            response.raise_for_status()
+            vectors.extend(response.json())
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors[0] if single else vectors
+
+
+def model_path(model_name=DEFAULT_MODEL):
+    """
+    Return a local directory holding model_name, downloading it only once.
+
+    Snapshots live under SENTENCE_TRANSFORMERS_HOME, so later runs load
+    straight from disk without any HuggingFace Hub round-trips.
+    """
+    if os.path.isdir(model_name):
+        return model_name
+
+    repo_id = model_name if '/' in model_name else f'sentence-transformers/{model_name}'
+    cache_dir = os.getenv('SENTENCE_TRANSFORMERS_HOME', os.path.expanduser('~/.cache/sbert'))
+    local_dir = os.path.join(cache_dir, repo_id.replace('/', '_'))
+
+    # Files are written atomically, so a pull interrupted part-way leaves
+    # some missing rather than truncated
+    if not all(os.path.isfile(os.path.join(local_dir, name)) for name in MODEL_FILES):
+        _download(repo_id, local_dir)
+    return local_dir
+
+
+def _download(repo_id, local_dir):
+    """
+    snapshot_download MODEL_FILES with the Hub online and XET_SETTINGS on.
+
+    huggingface_hub parses HF_HUB_OFFLINE and HF_XET_* once, at import,
+    which agentic_memory may already have done. So the settings go on its
+    parsed constants as well as in the environment (where hf_xet reads
+    them), and both are restored afterwards.
+    """
+    from huggingface_hub import constants, snapshot_download
+
+    settings = {'HF_HUB_OFFLINE': False}
+    settings.update({name: value for name, value in XET_SETTINGS.items() if name not in os.environ})
+    saved_env = {name: os.environ.get(name) for name in settings}
+    saved_constants = {name: getattr(constants, name) for name in settings if hasattr(constants, name)}
+
+    for name, value in settings.items():
+        os.environ[name] = str(int(value) if isinstance(value, bool) else value)
+    for name in saved_constants:
+        setattr(constants, name, settings[name])
+    try:
+        snapshot_download(repo_id=repo_id, local_dir=local_dir, allow_patterns=MODEL_FILES)
+    finally:
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        for name, value in saved_constants.items():
+            setattr(constants, name, value)
+
+
+def load_embedder(model_name=DEFAULT_MODEL):
+    """
+    Load the sentence embedding model used for batched encodes.
+
+    Setting OLLAMA_EMBED_MODEL routes embeddings through Ollama, and
+    TEI_URL through a Text Embeddings Inference server, instead. On CPU
+    the INT8 ONNX model is preferred when fast-sentence-transformers is
+    installed; otherwise this falls back to PyTorch SentenceTransformer.
+    """
+    ollama_model = os.getenv('OLLAMA_EMBED_MODEL')
+    if ollama_model:
+        return OllamaEmbedder(ollama_model)
+    tei_url = os.getenv('TEI_URL')
+    if tei_url:
+        return TeiEmbedder(tei_url)
+
+    model_name = model_path(model_name)
+    configure_torch()
+    device = default_device()
+    if device == 'cpu':
+        try:
+            return OnnxEmbedder(model_name)
+        except ImportError:
+            pass
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name, device=device)
+    if device == 'cuda':
+        # FP16 matmuls run on tensor cores; normalized cosine scores barely move
+        model.half()
+    return model
+
+
+def _pool_devices(model, count):
+    """
+    Worker devices for a SentenceTransformer pool, matching the device the
+    model was loaded on, or None when the texts should be encoded in-process.
+    """
+    if count <= MULTI_PROCESS_THRESHOLD or not hasattr(model, 'start_multi_process_pool'):
+        return None
+    device = str(getattr(model, 'device', 'cpu'))
+    if device.startswith('cuda'):
+        import torch
+        gpus = torch.cuda.device_count()
+        return [f'cuda:{i}' for i in range(gpus)] if gpus > 1 else None
+    if device == 'cpu' and (os.cpu_count() or 1) >= 8:
+        return ['cpu'] * 4  # SentenceTransformer's own default for CPU pools
+    return None
+
+
+def encode(model, texts, batch_size=None):
+    """
+    Encode texts in a single batched call, returning normalized vectors.
+
+    Texts are sorted by length before encoding so each batch pads to a
+    similar length, then the vectors are put back in input order. On a GPU
+    the vectors stay on the device as a tensor.
+
+    Large corpora are spread over a SentenceTransformer worker pool when
+    the model sits on one of several GPUs, or on the CPU of a many-core
+    machine; since the workers are spawned, the calling script must run
+    under an ``if __name__ == "__main__"`` guard.
+    """
+    # Taken from the model so remote and ONNX embedders never import torch
+    device = str(getattr(model, 'device', 'cpu'))
+    if batch_size is None:
+        batch_size = ENCODE_BATCH_SIZE if device == 'cpu' else GPU_ENCODE_BATCH_SIZE
+    texts = list(texts)
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i].split()))
+    sorted_texts = [texts[i] for i in order]
+
+    pool_devices = _pool_devices(model, len(texts))
+    if pool_devices:
+        pool = model.start_multi_process_pool(target_devices=pool_devices)
+        try:
+            embeddings = model.encode_multi_process(
+                sorted_texts, pool, batch_size=batch_size, normalize_embeddings=True
+            )
+        finally:
+            model.stop_multi_process_pool(pool)
+    else:
+        embeddings = model.encode(
+            sorted_texts,
+            batch_size=batch_size,
+            convert_to_tensor=True,
+            device=device,
+            normalize_embeddings=True,
+        )
+
+    inverse = [0] * len(order)
+    for position, index in enumerate(order):
+        inverse[index] = position
+    return embeddings[inverse]
+
+
+class CachedEmbeddingFunction:
+    """
+    Chroma embedding function backed by a preloaded model.
+
+    Texts primed ahead of time are answered from the cache; anything else
+    is encoded in one batch when Chroma asks for it. The cache keeps the
+    CACHE_SIZE most recently used texts, so a long-lived daemon does not
+    hold every note and query it has ever seen.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self._cache = collections.OrderedDict()
+
+    def _store(self, text, vector):
+        self._cache[text] = vector
+        self._cache.move_to_end(text)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def prime(self, texts, vectors):
+        # One device-to-host copy for the whole batch, not one per row
+        for text, vector in zip(texts, vectors.tolist()):
+            self._store(text, vector)
+
+    def __call__(self, input):
+        vectors = {}
+        for text in dict.fromkeys(input):
+            if text in self._cache:
+                self._cache.move_to_end(text)
+                vectors[text] = self._cache[text]
+        missing = [text for text in dict.fromkeys(input) if text not in vectors]
+        if missing:
+            for text, vector in zip(missing, encode(self.model, missing).tolist()):
+                vectors[text] = vector
+                self._store(text, vector)
+        return [vectors[text] for text in input]
+
+
+@functools.lru_cache(maxsize=None)
+def indexed_retriever(base):
+    """
+    Subclass A-mem's ChromaRetriever so that search() ranks notes through
+    an int8 QuantizedIndex instead of Chroma's float32 HNSW index.
+
+    Chroma still stores every note, its metadata and its embedding; the
+    index mirrors those embeddings, so every add, update and delete A-mem
+    makes goes to both. The index is saved next to Chroma's files at exit
+    and memory-mapped back on the next start while it still holds exactly
+    Chroma's notes; otherwise it is rebuilt from Chroma's embeddings.
+    """
+    import numpy as np
+    from vector_index import QuantizedIndex
+
+    class IndexedRetriever(base):
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self._index_path = os.path.join(self.persist_directory, INDEX_DIR)
+            self.index = self._load_index()
+            self._index_changed = self.index is None
+            if self.index is None:
+                self.index = QuantizedIndex()
+                for offset in range(0, self.collection.count(), INDEX_FILL_BATCH):
+                    self._index_stored(limit=INDEX_FILL_BATCH, offset=offset)
+            atexit.register(self._save_index)
+
+        def _load_index(self):
+            """The saved index if it matches the collection, else None."""
+            try:
+                index = QuantizedIndex.load(self._index_path)
+            except (OSError, ValueError):  # missing, or a partial write
+                return None
+            stored_ids = self.collection.get(include=[])['ids']
+            if len(index) != len(stored_ids) or not all(doc_id in index for doc_id in stored_ids):
+                return None  # Chroma was changed without this index
+            return index
+
+        def _save_index(self):
+            if self._index_changed:
+                self.index.save(self._index_path)
+                self._index_changed = False
+
+        def _index_stored(self, **where):
+            """Copy the embeddings Chroma holds for the selected notes into the index."""
+            stored = self.collection.get(include=['embeddings'], **where)
+            if len(stored['ids']):
+                vectors = np.asarray(stored['embeddings'], dtype=np.float32)
+                vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+                self.index.add(stored['ids'], vectors)
+                self._index_changed = True
+
+        def add_document(self, document, metadata, doc_id):
+            super().add_document(document, metadata, doc_id)
+            self._index_stored(ids=[doc_id])
+
+        def update_document(self, doc_id, metadata, content=None):
+            super().update_document(doc_id, metadata, content)
+            self._index_stored(ids=[doc_id])  # replaces the note's old row
+
+        def delete_document(self, doc_id):
+            super().delete_document(doc_id)
+            self.index.remove([doc_id])
+            self._index_changed = True
+
+        def search(self, query, k=5):
+            """Rank through the index and return a result shaped like Chroma's query()."""
+            hits = self.index.search(self.embedding_function([query])[0], k)
+            metadata = self.get_by_ids([doc_id for doc_id, _ in hits]) if hits else {}
+            hits = [(doc_id, score) for doc_id, score in hits if doc_id in metadata]
+            return {
+                'ids': [[doc_id for doc_id, _ in hits]],
+                'metadatas': [[metadata[doc_id] for doc_id, _ in hits]],
+                'documents': [[metadata[doc_id].get('content') for doc_id, _ in hits]],
+                # Chroma's default l2 space: squared distance between unit vectors
+                'distances': [[2.0 - 2.0 * score for _, score in hits]],
+            }
+
+    return IndexedRetriever
+
+
+def create_memory_system(model_name=DEFAULT_MODEL, embedder=None, vector_index=True, **kwargs):
+    """
+    Build an AgenticMemorySystem whose retriever embeds through the shared
+    cached embedding function, so add_notes_batch() can pre-encode notes.
+
+    Pass an already-loaded model as embedder to reuse it instead of
+    loading model_name a second time. Searches rank through an int8 index
+    (see indexed_retriever()); vector_index=False leaves them to Chroma.
+
+    With AMEM_DAEMON=1 and no embedder, returns a client for a running
+    scripts/amem_daemon.py instead of loading anything in this process;
+    the daemon must have been started with the same model and LLM backend.
+    """
+    if os.getenv('AMEM_DAEMON') == '1' and embedder is None:
+        from amem_daemon import connect, daemon_config
+
+        client = connect(config=daemon_config(
+            model_name, kwargs.get('llm_backend'), kwargs.get('llm_model')
+        ))
+        if client is not None:
+            return client
+
+    from agentic_memory import memory_system as amem, retrievers
+
+    embedding_function = None
+    if hasattr(retrievers, 'SentenceTransformerEmbeddingFunction'):
+        embedding_function = CachedEmbeddingFunction(embedder or load_embedder(model_name))
+        # A-mem builds its Chroma embedder by model name; hand it ours instead
+        retrievers.SentenceTransformerEmbeddingFunction = lambda *args, **kw: embedding_function
+    if hasattr(amem, 'ChromaRetriever') and hasattr(retrievers.ChromaRetriever, 'get_by_ids'):
+        amem.ChromaRetriever = (
+            indexed_retriever(retrievers.ChromaRetriever) if vector_index
+            else retrievers.ChromaRetriever
+        )
+
+    memory_system = amem.AgenticMemorySystem(model_name=model_name, **kwargs)
+    memory_system._batch_embedder = embedding_function
+    memory_system._ollama_model = (
+        kwargs.get('llm_model') if kwargs.get('llm_backend') == 'ollama' else None
+    )
+    return memory_system
+
+
+class BatchAddError(Exception):
+    """
+    Raised by add_notes_batch() when some notes failed to add.
+
+    The others were still added: memory_ids holds one entry per note (None
+    where it failed) and errors the matching error messages (None where it
+    succeeded).
+    """
+
+    def __init__(self, memory_ids, errors):
+        self.memory_ids = memory_ids
+        self.errors = errors
+        failed = sum(error is not None for error in errors)
+        super().__init__(f"{failed} of {len(errors)} notes failed to add")
+
+
+def _note_fields(tags, analysis):
+    """Merge caller tags with a pre-computed enrichment into add_note() kwargs."""
+    if not analysis:
+        return {'tags': tags}
+    return {
+        'keywords': analysis['keywords'],
+        'context': analysis['context'],
+        'tags': list(dict.fromkeys(list(tags) + analysis['tags'])),
+    }
+
+
+def add_notes_batch(memory_system, contents, tags_list):
+    """
+    Add several notes, encoding all of their contents in one forward pass.
+
+    With an Ollama backend the per-note LLM enrichment also runs
+    concurrently up front, so add_note() only has to link and evolve.
+    Returns the new note ids in input order. A failing note does not stop
+    the rest of the batch; see BatchAddError.
+    """
+    if hasattr(memory_system, 'add_notes_batch'):
+        # The daemon client batches on the daemon side
+        return memory_system.add_notes_batch(contents, tags_list)
+
+    contents = list(contents)
+    embedder = getattr(memory_system, '_batch_embedder', None)
+    if embedder is not None and contents:
+        embedder.prime(contents, encode(embedder.model, contents))
+
+    analyses = [{}] * len(contents)
+    ollama_model = getattr(memory_system, '_ollama_model', None)
+    if ollama_model and contents:
+        from ollama_client import enrich_batch
+        analyses = asyncio.run(enrich_batch(contents, ollama_model))
+
+    # Inserts stay sequential: evolution of each note depends on the ones before it
+    memory_ids, errors = [], []
+    for content, tags, analysis in zip(contents, tags_list, analyses):
+        try:
+            memory_ids.append(memory_system.add_note(content=content, **_note_fields(tags, analysis)))
+            errors.append(None)
+        except Exception as e:
+            memory_ids.append(None)
+            errors.append(f"{type(e).__name__}: {e}")
+
+    if any(error is not None for error in errors):
+        raise BatchAddError(memory_ids, errors)
+    return memory_ids
+
+
+def search_agentic_batch(memory_system, queries, k=5):
+    """
+    Run search_agentic() for several queries with one encode of all of them.
+
+    The query vectors are primed into the embedding cache first, so each
+    search_agentic() call finds its vector there instead of encoding it.
+    Returns one result list per query, in input order.
+    """
+    if hasattr(memory_system, 'search_agentic_batch'):
+        # The daemon client batches on the daemon side
+        return memory_system.search_agentic_batch(queries, k=k)
+
+    queries = list(queries)
+    embedder = getattr(memory_system, '_batch_embedder', None)
+    if embedder is not None and queries:
+        embedder.prime(queries, encode(embedder.model, queries))
+    return [memory_system.search_agentic(query, k=k) for query in queries]
@@ -0,0 +1,55 @@
+"""
+Shared keep-alive HTTP client for the A-mem scripts.
+
+Every Ollama (and other local service) call goes through a pooled
+client, so repeated requests reuse open connections instead of paying a
+new TCP handshake each time. Liveness probes use a second pool that
+never retries.
+"""
+
+import httpx
+
+_client = None
+_probe_client = None
+
+
+def _transport(retries):
+    try:
+        import h2  # noqa: F401 - enables HTTP/2 when installed
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    return httpx.HTTPTransport(
+        retries=retries,
+        http2=http2,
+        limits=httpx.Limits(
+            max_keepalive_connections=40,
+            max_connections=100,
+            keepalive_expiry=30.0,
+        ),
+    )
+
+
+def get_client():
+    """Return the process-wide pooled HTTP client, creating it on first use."""
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            transport=_transport(retries=3),
+            timeout=httpx.Timeout(300.0, connect=10.0),
+        )
+    return _client
+
+
+def get_probe_client():
+    """
+    Return the pooled client for liveness probes.
+
+    It makes no connect retries, so a service that is down is reported
+    straight away instead of after get_client()'s retry backoff.
+    """
+    global _probe_client
+    if _probe_client is None:
+        _probe_client = httpx.Client(transport=_transport(retries=0), timeout=5.0)
+    return _probe_client
@@ -0,0 +1,168 @@
+"""
+Ollama HTTP helpers shared by the A-mem scripts.
+"""
+
+import asyncio
+import json
+import os
+import time
+
+import httpx
+
+from http_client import get_client, get_probe_client
+
+OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
+EMBED_BATCH_SIZE = int(os.getenv('OLLAMA_EMBED_BATCH_SIZE', '64'))
+TAGS_TTL = 5.0
+
+_tags_cache = None  # (monotonic time, /api/tags response)
+
+
+def embed(texts, model, batch_size=EMBED_BATCH_SIZE):
+    """
+    Embed texts through Ollama's batch /api/embed endpoint.
+
+    Sends one request per batch_size texts. Servers without the batch
+    endpoint fall back to concurrent per-text /api/embeddings calls.
+    """
+    texts = list(texts)
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        chunk = texts[start:start + batch_size]
+        response = get_client().post(
+            f"{OLLAMA_HOST}/api/embed",
+            json={"model": model, "input": chunk},
+        )
+        embeddings = response.json().get('embeddings') if response.is_success else None
+        if embeddings is None:
+            embeddings = asyncio.run(_embed_each(chunk, model))
+        vectors.extend(embeddings)
+    return vectors
+
+
+async def _embed_each(texts, model):
+    """Embed texts one request each via the legacy /api/embeddings endpoint."""
+    def embed_one(text):
+        response = get_client().post(
+            f"{OLLAMA_HOST}/api/embeddings",
+            json={"model": model, "prompt": text},
+        )
+        response.raise_for_status()
+        return response.json()['embedding']
+
+    return await asyncio.gather(*(asyncio.to_thread(embed_one, text) for text in texts))
+
+
+def _probe(timeout):
+    """
+    GET /api/tags once through the no-retry probe client, caching a 200
+    response for tags().
+    """
+    global _tags_cache
+    response = get_probe_client().get(f"{OLLAMA_HOST}/api/tags", timeout=timeout)
+    if response.status_code == 200:
+        _tags_cache = (time.monotonic(), response)
+    return response
+
+
+def tags(timeout=5):
+    """
+    GET /api/tags, the cheapest probe for whether Ollama is up.
+
+    Successful responses are reused for TAGS_TTL seconds, so back-to-back
+    checks in one script share a single request. Raises httpx.TransportError
+    straight away when nothing is listening.
+    """
+    if _tags_cache is not None and time.monotonic() - _tags_cache[0] < TAGS_TTL:
+        return _tags_cache[1]
+    return _probe(timeout)
+
+
+def model_names(response):
+    """Return the set of model names in an /api/tags response."""
+    return {m.get('name', '') for m in response.json().get('models', [])}
+
+
+def wait_until_ready(timeout=30.0):
+    """
+    Poll /api/tags with exponential backoff until Ollama answers 200.
+
+    Returns the seconds waited, or None if the deadline passed first.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    delay = 0.05
+    while True:
+        try:
+            if _probe(timeout=0.25).status_code == 200:
+                return time.monotonic() - start
+        except httpx.TransportError:
+            pass
+        if time.monotonic() + delay > deadline:
+            return None
+        time.sleep(delay)
+        delay = min(delay * 2, 2.0)
+
+
+ENRICH_PROMPT = """Analyze the following note and return a JSON object with:
+- "keywords": up to 5 key terms, most important first
+- "context": one sentence on the main topic and domain
+- "tags": up to 5 broad category tags
+
+Note:
+{content}"""
+
+
+def _is_str_list(value):
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+async def enrich_async(content, model):
+    """
+    Ask Ollama for a note's keywords, context and tags.
+
+    Returns {} when the reply is not the expected shape, so the note falls
+    back to A-mem's own analysis.
+    """
+    # The pooled client is synchronous and thread-safe; each request gets a thread
+    response = await asyncio.to_thread(
+        get_client().post,
+        f"{OLLAMA_HOST}/api/chat",
+        json={
+            "model": model,
+            "messages": [{"role": "user", "content": ENRICH_PROMPT.format(content=content)}],
+            "format": "json",
+            "stream": False,
+        },
+    )
+    response.raise_for_status()
+    analysis = json.loads(response.json()['message']['content'])
+    if not isinstance(analysis, dict):
+        return {}
+    keywords, note_tags = analysis.get('keywords'), analysis.get('tags')
+    if not (_is_str_list(keywords) and _is_str_list(note_tags)):
+        # e.g. "keywords": "a, b"; let A-mem run its own analysis instead
+        return {}
+    context = analysis.get('context')
+    return {
+        'keywords': keywords,
+        'context': context if isinstance(context, str) else '',
+        'tags': note_tags,
+    }
+
+
+async def enrich_batch(contents, model):
+    """
+    Enrich several notes concurrently, up to OLLAMA_NUM_PARALLEL at a time.
+
+    Returns one analysis dict per content; notes whose enrichment failed
+    get an empty dict so the caller can fall back to A-mem's own analysis.
+    """
+    semaphore = asyncio.Semaphore(int(os.getenv('OLLAMA_NUM_PARALLEL', '4')))
+
+    async def enrich_one(content):
+        async with semaphore:
+            return await enrich_async(content, model)
+
+    results = await asyncio.gather(*(enrich_one(c) for c in contents), return_exceptions=True)
+    return [{} if isinstance(result, Exception) else result for result in results]
@@ -0,0 +1,42 @@
+#!/bin/bash
+# Script to run Text Embeddings Inference (TEI) as an embedding sidecar
+# for the A-mem scripts. Point them at it with:
+#   export TEI_URL=http://localhost:8080
+
+set -e
+
+TEI_IMAGE="${TEI_IMAGE:-ghcr.io/huggingface/text-embeddings-inference:cpu-latest}"
+TEI_MODEL="${TEI_MODEL:-sentence-transformers/all-MiniLM-L6-v2}"
+TEI_PORT="${TEI_PORT:-8080}"
+TEI_DATA="$HOME/.cache/tei"
+
+echo "🧮 Text Embeddings Inference Launcher"
+echo "======================================"
+
+if ! command -v docker >/dev/null 2>&1; then
+    echo "❌ docker not found"
+    echo "   Install Docker, or run TEI natively: https://github.com/huggingface/text-embeddings-inference"
+    exit 1
+fi
+
+# Model weights are cached here between runs
+mkdir -p "$TEI_DATA"
+
+echo ""
+echo "🚀 Starting TEI..."
+echo "   Model: $TEI_MODEL"
+echo "   Port: $TEI_PORT"
+echo ""
+echo "   Then run: export TEI_URL=http://localhost:$TEI_PORT"
+echo ""
+
+# Server-side batching and dynamic padding; allow the batch sizes the
+# scripts send (64 on CPU, 128 on GPU) in a single request
+exec docker run --rm \
+    -p "$TEI_PORT:$TEI_PORT" \
+    -v "$TEI_DATA:/data" \
+    "$TEI_IMAGE" \
+    --model-id "$TEI_MODEL" \
+    --port "$TEI_PORT" \
+    --max-batch-tokens 16384 \
+    --max-client-batch-size 128
@@ -7,6 +7,8 @@ Downloads the embedding model and configures the environment.
 import os
 import sys
 
+_HOME = os.path.expanduser("~")
+
 print("🚀 Setting up A-mem with Ollama")
 print("=" * 60)
 
@@ -15,12 +17,15 @@ print("\n📦 Step 1: Downloading embedding model...")
 print("   Model: sentence-transformers/all-MiniLM-L6-v2")
 
 try:
-    from sentence_transformers import SentenceTransformer
+    from amem_embeddings import load_embedder, model_path
 
-    # Download the model (will cache it locally)
+    # Download one snapshot into the shared cache; later runs load it from
+    # disk. Uses the INT8 ONNX backend on CPU when fast-sentence-transformers
+    # is installed
     print("   Downloading... (this may take a minute)")
-    model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
-    print("   ✅ Embedding model downloaded successfully")
+    local_model = model_path('sentence-transformers/all-MiniLM-L6-v2')
+    model = load_embedder(local_model)
+    print(f"   ✅ Embedding model downloaded to {local_model}")
 
     # Test the model
     test_embedding = model.encode("test sentence")
@@ -28,54 +33,53 @@ try:
 
 except Exception as e:
     print(f"   ❌ Failed to download model: {e}")
-    print("\n   Trying alternative approach...")
-
-    try:
-        # Try downloading without the sentence-transformers prefix
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        print("   ✅ Embedding model downloaded successfully (alternative method)")
-    except Exception as e2:
-        print(f"   ❌ Alternative method also failed: {e2}")
-        sys.exit(1)
+    sys.exit(1)
 
 # Step 2: Verify Ollama is running
 print("\n🔌 Step 2: Verifying Ollama...")
 
-import subprocess
-import requests
-import time
+import httpx
+from ollama_client import model_names, tags, wait_until_ready
 
 try:
-    # Check if Ollama is running
-    response = requests.get("http://localhost:11434/api/tags", timeout=5)
+    # Check if Ollama is running (no connect retries, fails fast)
+    response = tags(timeout=5)
     if response.status_code == 200:
         print("   ✅ Ollama is running")
-        models = response.json().get('models', [])
-        llama_found = any('llama3.2' in m.get('name', '') for m in models)
+        models = model_names(response)
+        llama_found = any(name.startswith('llama3.2') for name in models)
 
         if llama_found:
             print("   ✅ llama3.2 model is available")
         else:
             print("   ⚠️  llama3.2 not found, but other models available")
-            print(f"      Available: {[m.get('name') for m in models[:3]]}")
+            print(f"      Available: {sorted(models)[:3]}")
     else:
         print("   ⚠️  Ollama responded but with unexpected status")
-except requests.exceptions.ConnectionError:
+except httpx.TransportError:
     print("   ⚠️  Ollama is not running")
     print("   Starting Ollama in background...")
 
     try:
-        # Try to start Ollama
+        import subprocess
+
+        # Try to start Ollama, with the same parallelism defaults the env
+        # file exports (values already in the environment win)
+        ollama_env = {
+            'OLLAMA_NUM_PARALLEL': '4',
+            'OLLAMA_MAX_LOADED_MODELS': '2',
+            'OLLAMA_KEEP_ALIVE': '30m',
+            'OLLAMA_FLASH_ATTENTION': '1',
+            **os.environ,
+        }
         subprocess.Popen(['ollama', 'serve'],
+                        env=ollama_env,
                         stdout=subprocess.DEVNULL,
                         stderr=subprocess.DEVNULL)
         print("   Waiting for Ollama to start...")
-        time.sleep(3)
-
-        # Check again
-        response = requests.get("http://localhost:11434/api/tags", timeout=5)
-        if response.status_code == 200:
-            print("   ✅ Ollama started successfully")
+        elapsed = wait_until_ready(timeout=30)
+        if elapsed is not None:
+            print(f"   ✅ Ollama started successfully ({elapsed:.2f}s)")
         else:
             print("   ❌ Ollama failed to start properly")
     except Exception as e:
@@ -86,15 +90,17 @@ except requests.exceptions.ConnectionError:
 print("\n🧪 Step 3: Testing A-mem initialization...")
 
 try:
-    from agentic_memory.memory_system import AgenticMemorySystem
+    from amem_embeddings import create_memory_system
 
     # Set Ollama environment variables
     os.environ['OLLAMA_HOST'] = 'http://localhost:11434'
     os.environ['OLLAMA_MODEL'] = 'llama3.2'
 
+    # Reuse the model loaded in Step 1 rather than loading it again
     print("   Initializing with Ollama backend...")
-    memory_system = AgenticMemorySystem(
-        model_name='all-MiniLM-L6-v2',
+    memory_system = create_memory_system(
+        model_name=local_model,
+        embedder=model,
         llm_backend='ollama',
         llm_model='llama3.2'
     )
@@ -122,11 +128,22 @@ except Exception as e:
 # Step 4: Create environment file
 print("\n📝 Step 4: Creating environment configuration...")
 
-env_file = os.path.expanduser("~/memory-layer/.env.amem")
+env_file = f"{_HOME}/memory-layer/.env.amem"
 env_content = """# A-mem Configuration with Ollama
 export OLLAMA_HOST="http://localhost:11434"
 export OLLAMA_MODEL="llama3.2"
 
+# Ollama concurrency (restart 'ollama serve' after changing these)
+export OLLAMA_NUM_PARALLEL=4
+export OLLAMA_MAX_LOADED_MODELS=2
+export OLLAMA_KEEP_ALIVE=30m
+export OLLAMA_FLASH_ATTENTION=1
+
+# Shared model cache; the embedding model is already downloaded here
+export SENTENCE_TRANSFORMERS_HOME="$HOME/.cache/sbert"
+export HF_HOME="$HOME/.cache/huggingface"
+export HF_HUB_OFFLINE=1
+
 # To use these settings, run:
 # source ~/.env.amem
 """
@@ -136,6 +153,7 @@ try:
         f.write(env_content)
     print(f"   ✅ Configuration saved to: {env_file}")
     print(f"   Run: source {env_file}")
+    print("   Restart 'ollama serve' after sourcing so the parallelism settings apply")
 except Exception as e:
     print(f"   ⚠️  Could not create env file: {e}")
 
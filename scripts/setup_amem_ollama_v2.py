@@ -6,18 +6,20 @@ Handles HuggingFace authentication issues.
 
 import os
 import sys
-import shutil
+
+# Resolved once; every path below is built from it
+_HOME = os.path.expanduser("~")
 
 print("🚀 Setting up A-mem with Ollama (v2 - Fixed)")
 print("=" * 60)
 
 # Step 0: Clear any problematic HuggingFace cache
 print("\n🧹 Step 0: Cleaning HuggingFace cache...")
-hf_cache = os.path.expanduser("~/.cache/huggingface")
-hf_token = os.path.expanduser("~/.huggingface/token")
+hf_token = f"{_HOME}/.huggingface/token"
 
-# Remove token file if it exists and is causing issues
-if os.path.exists(hf_token):
+# Remove token file if it exists and is causing issues (lexists: no
+# symlink chasing into the cache)
+if os.path.lexists(hf_token):
     try:
         os.remove(hf_token)
         print(f"   ✅ Removed problematic token file")
@@ -34,78 +36,56 @@ for env_var in ['HF_TOKEN', 'HUGGINGFACE_TOKEN', 'HF_API_TOKEN']:
 os.environ['HF_HUB_OFFLINE'] = '0'
 os.environ['TRANSFORMERS_OFFLINE'] = '0'
 
-# Step 1: Download the embedding model using transformers first
+# Step 1: Download the embedding model once and load it from disk
 print("\n📦 Step 1: Downloading embedding model (fixed method)...")
 print("   Model: all-MiniLM-L6-v2")
 
 try:
-    from transformers import AutoTokenizer, AutoModel
-    import torch
-
-    model_name = "sentence-transformers/all-MiniLM-L6-v2"
+    from amem_embeddings import load_embedder, model_path
 
-    print("   Downloading tokenizer...")
-    tokenizer = AutoTokenizer.from_pretrained(model_name, trust_remote_code=True)
-    print("   ✅ Tokenizer downloaded")
+    print("   Downloading snapshot...")
+    local_model = model_path("sentence-transformers/all-MiniLM-L6-v2")
+    print(f"   ✅ Model downloaded to {local_model}")
 
-    print("   Downloading model...")
-    model = AutoModel.from_pretrained(model_name, trust_remote_code=True)
-    print("   ✅ Model downloaded")
-
-    # Test it
-    inputs = tokenizer("test sentence", return_tensors="pt", padding=True, truncation=True)
-    with torch.no_grad():
-        outputs = model(**inputs)
-    print(f"   ✅ Model working (output shape: {outputs.last_hidden_state.shape})")
+    # Single load from the local snapshot (INT8 ONNX on CPU when available)
+    model = load_embedder(local_model)
+    test_embedding = model.encode("test sentence")
+    print(f"   ✅ Model working (embedding dim: {len(test_embedding)})")
 
 except Exception as e:
-    print(f"   ❌ Failed with transformers: {e}")
-    print("\n   Trying direct sentence-transformers approach...")
-
-    try:
-        # Try to use sentence_transformers with trust_remote_code
-        from sentence_transformers import SentenceTransformer
-
-        # Download without prefix and with trust_remote_code
-        model = SentenceTransformer('all-MiniLM-L6-v2', trust_remote_code=True)
-        test_embedding = model.encode("test sentence")
-        print(f"   ✅ Model working (embedding dim: {len(test_embedding)})")
-
-    except Exception as e2:
-        print(f"   ❌ All methods failed: {e2}")
-        print("\n   📝 Note: You may need to:")
-        print("      1. Check your internet connection")
-        print("      2. Clear HuggingFace cache: rm -rf ~/.cache/huggingface")
-        print("      3. Try again")
-        sys.exit(1)
+    print(f"   ❌ Model download failed: {e}")
+    print("\n   📝 Note: You may need to:")
+    print("      1. Check your internet connection")
+    print("      2. Clear HuggingFace cache: rm -rf ~/.cache/huggingface")
+    print("      3. Try again")
+    sys.exit(1)
 
 # Step 2: Verify Ollama
 print("\n🔌 Step 2: Verifying Ollama...")
 
-import subprocess
 try:
-    import requests
+    import httpx
 except ImportError:
-    print("   Installing requests...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "requests"])
-    import requests
+    import subprocess
+    print("   Installing httpx...")
+    subprocess.check_call([sys.executable, "-m", "pip", "install", "-q", "httpx[http2]"])
 
-import time
+from ollama_client import model_names, tags
 
 ollama_running = False
 try:
-    response = requests.get("http://localhost:11434/api/tags", timeout=5)
+    response = tags(timeout=5)
     if response.status_code == 200:
         print("   ✅ Ollama is running")
-        models = response.json().get('models', [])
-        llama_found = any('llama3.2' in m.get('name', '') for m in models)
+        models = model_names(response)
+        llama_found = any(name.startswith('llama3.2') for name in models)
 
         if llama_found:
             print("   ✅ llama3.2 model is available")
             ollama_running = True
         else:
             print("   ⚠️  llama3.2 not found")
-            print(f"      Available models: {[m.get('name') for m in models[:5]]}")
+            print(f"      Available models: {sorted(models)[:5]}")
             # Still try to use it
             ollama_running = True
 except:
@@ -133,11 +113,22 @@ except Exception as e:
 # Step 4: Create environment file
 print("\n📝 Step 4: Creating environment configuration...")
 
-env_file = os.path.expanduser("~/memory-layer/.env.amem")
+env_file = f"{_HOME}/memory-layer/.env.amem"
 env_content = """# A-mem Configuration with Ollama
 export OLLAMA_HOST="http://localhost:11434"
 export OLLAMA_MODEL="llama3.2"
 
+# Ollama concurrency (restart 'ollama serve' after changing these)
+export OLLAMA_NUM_PARALLEL=4
+export OLLAMA_MAX_LOADED_MODELS=2
+export OLLAMA_KEEP_ALIVE=30m
+export OLLAMA_FLASH_ATTENTION=1
+
+# Shared model cache; the embedding model is already downloaded here
+export SENTENCE_TRANSFORMERS_HOME="$HOME/.cache/sbert"
+export HF_HOME="$HOME/.cache/huggingface"
+export HF_HUB_OFFLINE=1
+
 # Clear any HuggingFace authentication issues
 unset HF_TOKEN
 unset HUGGINGFACE_TOKEN
@@ -154,14 +145,15 @@ try:
     with open(env_file, 'w') as f:
         f.write(env_content)
     print(f"   ✅ Configuration saved to: {env_file}")
+    print("   Restart 'ollama serve' after sourcing so the parallelism settings apply")
 except Exception as e:
     print(f"   ⚠️  Could not create env file: {e}")
 
 # Step 5: Create a simple test script
 print("\n📝 Step 5: Creating simple test script...")
 
-test_script = os.path.expanduser("~/memory-layer/scripts/test_amem_simple.py")
-test_content = """#!/usr/bin/env python3
+test_script = f"{_HOME}/memory-layer/scripts/test_amem_simple.py"
+test_content = f"""#!/usr/bin/env python3
 import os
 os.environ['OLLAMA_HOST'] = 'http://localhost:11434'
 os.environ['OLLAMA_MODEL'] = 'llama3.2'
@@ -174,18 +166,18 @@ from agentic_memory.memory_system import AgenticMemorySystem
 
 print("Initializing A-mem with Ollama...")
 memory = AgenticMemorySystem(
-    model_name='all-MiniLM-L6-v2',
+    model_name={local_model!r},
     llm_backend='ollama',
     llm_model='llama3.2'
 )
 
 print("Adding test memory...")
 mem_id = memory.add_note("Test memory for A-mem with Ollama", tags=["test"])
-print(f"Created: {mem_id}")
+print(f"Created: {{mem_id}}")
 
 print("Searching...")
 results = memory.search_agentic("test", k=1)
-print(f"Found {len(results)} results")
+print(f"Found {{len(results)}} results")
 print("✅ A-mem working with Ollama!")
 """
 
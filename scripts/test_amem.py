@@ -6,7 +6,6 @@ This demonstrates the core A-mem functionality with the Python package.
 
 import os
 import sys
-from datetime import datetime
 
 # Set environment variables for testing
 # You can use OpenAI, Anthropic, or Ollama
@@ -18,10 +17,12 @@ if not os.getenv('OPENAI_API_KEY') and not os.getenv('ANTHROPIC_API_KEY'):
     print()
 
 try:
-    from agentic_memory.memory_system import AgenticMemorySystem
-    print("✅ A-mem package imported successfully")
+    from amem_embeddings import BatchAddError, add_notes_batch, create_memory_system, require_amem, search_agentic_batch
+
+    require_amem()
+    print("✅ A-mem package found")
 except ImportError as e:
-    print(f"❌ Failed to import A-mem: {e}")
+    print(f"❌ A-mem not available: {e}")
     print("   Run: source .venv/bin/activate && pip install git+https://github.com/WujiangXu/A-mem-sys.git")
     sys.exit(1)
 
@@ -53,7 +54,7 @@ def test_amem_basic():
         llm_model = None
 
     try:
-        memory_system = AgenticMemorySystem(
+        memory_system = create_memory_system(
             model_name='all-MiniLM-L6-v2',
             llm_backend=llm_backend,
             llm_model=llm_model
@@ -84,18 +85,24 @@ def test_amem_basic():
         }
     ]
 
-    memory_ids = []
-    for i, mem in enumerate(test_memories, 1):
-        try:
-            result = memory_system.add_note(
-                content=mem["content"],
-                tags=mem["tags"]
-            )
-            memory_ids.append(result)
-            print(f"   ✅ Memory {i} added: {result[:12]}...")
-        except Exception as e:
-            print(f"   ❌ Failed to add memory {i}: {e}")
-            return False
+    # Encode all contents in one batch instead of once per add_note()
+    contents = [m["content"] for m in test_memories]
+    tags_list = [m["tags"] for m in test_memories]
+    try:
+        memory_ids = add_notes_batch(memory_system, contents, tags_list)
+    except BatchAddError as e:
+        for i, (result, error) in enumerate(zip(e.memory_ids, e.errors), 1):
+            if error is None:
+                print(f"   ✅ Memory {i} added: {result[:12]}...")
+            else:
+                print(f"   ❌ Failed to add memory {i}: {error}")
+        return False
+    except Exception as e:
+        print(f"   ❌ Failed to add memories: {e}")
+        return False
+
+    for i, result in enumerate(memory_ids, 1):
+        print(f"   ✅ Memory {i} added: {result[:12]}...")
 
     # Search for memories
     print("\n3. Testing semantic search...")
@@ -105,16 +112,19 @@ def test_amem_basic():
         "Zettelkasten"
     ]
 
-    for query in search_queries:
-        try:
-            results = memory_system.search_agentic(query, k=2)
-            print(f"\n   Query: '{query}'")
-            print(f"   Found {len(results)} results:")
-            for r in results:
-                content = r.get('content', '')[:60]
-                print(f"     - {content}...")
-        except Exception as e:
-            print(f"   ❌ Search failed for '{query}': {e}")
+    # One encode for every query instead of one per search_agentic() call
+    try:
+        all_results = search_agentic_batch(memory_system, search_queries, k=2)
+    except Exception as e:
+        print(f"   ❌ Search failed: {e}")
+        all_results = []
+
+    for query, results in zip(search_queries, all_results):
+        print(f"\n   Query: '{query}'")
+        print(f"   Found {len(results)} results:")
+        for r in results:
+            content = r.get('content', '')[:60]
+            print(f"     - {content}...")
 
     # Retrieve a specific memory
     print("\n4. Testing memory retrieval...")
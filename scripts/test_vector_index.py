@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the int8 vector index (needs only numpy).
+
+Run: python scripts/test_vector_index.py
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from vector_index import QuantizedIndex
+
+
+def unit_vectors(count, dim=32, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class QuantizedIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.vectors = unit_vectors(200)
+        self.ids = [f'note-{i}' for i in range(len(self.vectors))]
+        self.index = QuantizedIndex()
+        self.index.add(self.ids, self.vectors)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def assertSameResults(self, expected, actual):
+        self.assertEqual([i for i, _ in expected], [i for i, _ in actual])
+        np.testing.assert_allclose([s for _, s in expected], [s for _, s in actual], rtol=1e-6)
+
+    def test_search_matches_float_ranking(self):
+        queries = unit_vectors(5, seed=1)
+        exact = queries @ self.vectors.T
+        for query, scores, hits in zip(queries, exact, self.index.search_batch(queries, k=5)):
+            self.assertEqual([i for i, _ in hits][0], self.ids[int(np.argmax(scores))])
+            np.testing.assert_allclose(
+                [s for _, s in hits], np.sort(scores)[::-1][:5], atol=0.02
+            )
+            self.assertSameResults(hits, self.index.search(query, k=5))
+
+    def test_empty_index(self):
+        self.assertEqual(QuantizedIndex().search_batch(unit_vectors(2), k=3), [[], []])
+
+    def test_save_load_round_trip(self):
+        self.index.save(self.tmp.name)
+        loaded = QuantizedIndex.load(self.tmp.name)
+        self.assertIsInstance(loaded._base[0], np.memmap)
+        self.assertEqual(loaded.ids, self.ids)
+        queries = unit_vectors(4, seed=2)
+        for expected, actual in zip(self.index.search_batch(queries), loaded.search_batch(queries)):
+            self.assertSameResults(expected, actual)
+
+    def test_populate_load(self):
+        self.index.save(self.tmp.name)
+        loaded = QuantizedIndex.load(self.tmp.name, populate=True)
+        query = unit_vectors(1, seed=3)
+        self.assertSameResults(self.index.search(query), loaded.search(query))
+
+    def test_add_after_load_keeps_the_mapping(self):
+        self.index.save(self.tmp.name)
+        loaded = QuantizedIndex.load(self.tmp.name)
+        extra = unit_vectors(3, seed=4)
+        loaded.add(['new-0', 'new-1', 'new-2'], extra)
+        self.assertIsInstance(loaded._base[0], np.memmap)
+        self.assertEqual(len(loaded), len(self.ids) + 3)
+        self.assertEqual(loaded.search(extra[1], k=1)[0][0], 'new-1')
+
+    def test_save_over_the_loaded_files(self):
+        self.index.save(self.tmp.name)
+        loaded = QuantizedIndex.load(self.tmp.name)
+        loaded.add(['new-0'], unit_vectors(1, seed=5))
+        loaded.save(self.tmp.name)  # used to truncate the mapped file (SIGBUS)
+
+        query = unit_vectors(1, seed=6)
+        reloaded = QuantizedIndex.load(self.tmp.name)
+        self.assertEqual(reloaded.ids, self.ids + ['new-0'])
+        self.assertSameResults(loaded.search(query), reloaded.search(query))
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['index.json', 'scales.f32', 'vectors.i8'])
+
+    def test_remove_masks_the_row(self):
+        self.index.remove(['note-7', 'missing'])
+        self.assertEqual(len(self.index), len(self.ids) - 1)
+        self.assertNotIn('note-7', self.index)
+        hits = self.index.search(self.vectors[7], k=len(self.ids))
+        self.assertEqual(len(hits), len(self.ids) - 1)
+        self.assertNotIn('note-7', [i for i, _ in hits])
+
+    def test_add_replaces_an_existing_id(self):
+        replacement = unit_vectors(1, seed=7)[0]
+        self.index.add(['note-3'], [replacement])
+        self.assertEqual(len(self.index), len(self.ids))
+        self.assertEqual(self.index.search(replacement, k=1)[0][0], 'note-3')
+        self.assertNotEqual(self.index.search(self.vectors[3], k=1)[0][0], 'note-3')
+
+    def test_save_drops_removed_rows(self):
+        self.index.save(self.tmp.name)
+        loaded = QuantizedIndex.load(self.tmp.name)
+        loaded.remove(self.ids[:10])
+        loaded.add(['new-0'], unit_vectors(1, seed=8))
+        loaded.save(self.tmp.name)
+
+        reloaded = QuantizedIndex.load(self.tmp.name)
+        self.assertEqual(reloaded.ids, self.ids[10:] + ['new-0'])
+        query = unit_vectors(1, seed=9)
+        self.assertSameResults(loaded.search(query), reloaded.search(query))
+
+    def test_compacts_once_most_rows_are_removed(self):
+        vectors = unit_vectors(3000, seed=10)
+        ids = [f'bulk-{i}' for i in range(len(vectors))]
+        index = QuantizedIndex()
+        index.add(ids, vectors)
+        index.remove(ids[:2000])
+        self.assertEqual(index.ids, ids[2000:])
+        self.assertFalse(index._dead)
+        self.assertEqual(index.search(vectors[2500], k=1)[0][0], 'bulk-2500')
+
+    def test_load_rejects_mismatched_files(self):
+        self.index.save(self.tmp.name)
+        with open(os.path.join(self.tmp.name, 'vectors.i8'), 'r+b') as f:
+            f.truncate(100)
+        with self.assertRaises(ValueError):
+            QuantizedIndex.load(self.tmp.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
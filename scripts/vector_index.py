@@ -0,0 +1,267 @@
+"""
+Int8-quantized vector index for the A-mem scripts.
+
+Vectors are normalized at encode time, so cosine similarity is a plain
+dot product. Each stored row is quantized to int8 with its own scale
+(127 / max|v|), which keeps the matrix at a quarter of its FP32 size in
+memory, on disk and in the page cache.
+
+numpy has no int8 or fp16 BLAS (an int8 matmul runs ~30x slower than
+float32), so search widens a small block of rows at a time into a reused
+float32 buffer that stays in cache and scores it with the float32 BLAS.
+Main memory only ever streams int8 rows: on 100k x 384 rows that scores a
+query in ~10 ms, against ~13 ms for the same matrix held as float32.
+
+Saved indexes are memory-mapped on load, so a cold start pages rows in as
+searches touch them instead of reading the whole matrix into the heap.
+"""
+
+import contextlib
+import json
+import mmap
+import os
+
+import numpy as np
+
+# Rows widened to float32 per matmul; 128 x 384 floats fit in L2
+SEARCH_CHUNK_ROWS = 128
+
+# Removed rows tolerated before the live ones are compacted into the tail
+COMPACT_MIN_DEAD = 1024
+
+ROWS_FILE = 'vectors.i8'
+SCALES_FILE = 'scales.f32'
+META_FILE = 'index.json'
+
+
+def _as_array(vectors):
+    """Convert a torch tensor or array-like batch of vectors to float32 numpy."""
+    if hasattr(vectors, 'detach'):
+        vectors = vectors.detach().float().cpu().numpy()
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def _map_rows(path, shape, populate):
+    """Memory-map a raw int8 row file read-only, optionally prefaulting it."""
+    if populate and hasattr(mmap, 'MAP_POPULATE'):
+        with open(path, 'rb') as f:
+            buffer = mmap.mmap(
+                f.fileno(), 0,
+                flags=mmap.MAP_SHARED | mmap.MAP_POPULATE,
+                prot=mmap.PROT_READ,
+            )
+        return np.frombuffer(buffer, dtype=np.int8).reshape(shape)
+    return np.memmap(path, dtype=np.int8, mode='r', shape=shape)
+
+
+@contextlib.contextmanager
+def _replacing(path, mode='wb'):
+    """
+    Write to a temporary file next to path, then rename it over path.
+
+    A loaded index may be reading its rows straight out of path through a
+    mapping, so the old file is never truncated underneath it.
+    """
+    tmp_path = f'{path}.tmp'
+    try:
+        with open(tmp_path, mode) as f:
+            yield f
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class QuantizedIndex:
+    """
+    Brute-force dot-product index over int8 rows with per-row scales.
+
+    Rows live in two blocks: the base mapped from disk by load(), and an
+    in-memory tail that add() appends to, so inserting after a load never
+    copies the mapping into the heap. remove() only marks a row dead (its
+    slot in ids becomes None); dead rows are masked out of every search and
+    dropped by save(), or compacted away once they outnumber the live ones.
+    """
+
+    def __init__(self):
+        self.ids = []  # one entry per stored row; None where a row was removed
+        self._positions = {}  # id -> row
+        self._dead = set()
+        self._base = None  # (rows, scales) from load()
+        self._tail_rows = None  # grown by doubling; the first _tail_count rows are filled
+        self._tail_scales = None
+        self._tail_count = 0
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._positions
+
+    def _blocks(self):
+        """Yield (rows, scales) for the base and the filled part of the tail."""
+        if self._base is not None:
+            yield self._base
+        if self._tail_count:
+            yield self._tail_rows[:self._tail_count], self._tail_scales[:self._tail_count]
+
+    def _live_chunks(self):
+        """Yield (rows, scales) for live rows only, a bounded chunk at a time."""
+        offset = 0
+        for rows, scales in self._blocks():
+            for start in range(0, len(rows), SEARCH_CHUNK_ROWS * 32):
+                end = min(start + SEARCH_CHUNK_ROWS * 32, len(rows))
+                live = [self.ids[i] is not None for i in range(offset + start, offset + end)]
+                if all(live):
+                    yield rows[start:end], scales[start:end]
+                elif any(live):
+                    yield rows[start:end][live], scales[start:end][live]
+            offset += len(rows)
+
+    def _reserve(self, extra, dim):
+        """Make room in the tail for extra more rows."""
+        needed = self._tail_count + extra
+        if self._tail_rows is not None and needed <= len(self._tail_rows):
+            return
+        capacity = max(needed, 2 * self._tail_count, 64)
+        rows = np.empty((capacity, dim), dtype=np.int8)
+        scales = np.empty(capacity, dtype=np.float32)
+        if self._tail_count:
+            rows[:self._tail_count] = self._tail_rows[:self._tail_count]
+            scales[:self._tail_count] = self._tail_scales[:self._tail_count]
+        self._tail_rows, self._tail_scales = rows, scales
+
+    def _compact(self):
+        """Copy the live rows into a fresh tail, releasing the base mapping."""
+        chunks = list(self._live_chunks())
+        ids = [doc_id for doc_id in self.ids if doc_id is not None]
+        dim = chunks[0][0].shape[1] if chunks else 0
+        self.__init__()
+        if chunks:
+            self._reserve(len(ids), dim)
+            self._tail_count = len(ids)
+            self._tail_rows[:len(ids)] = np.concatenate([rows for rows, _ in chunks])
+            self._tail_scales[:len(ids)] = np.concatenate([scales for _, scales in chunks])
+        self.ids = ids
+        self._positions = {doc_id: row for row, doc_id in enumerate(ids)}
+
+    def add(self, ids, vectors):
+        """
+        Quantize and append normalized vectors under the given ids.
+
+        An id that is already stored has its old row replaced.
+        """
+        vectors = _as_array(vectors)
+        if not len(vectors):
+            return
+        scales = 127.0 / np.maximum(np.abs(vectors).max(axis=1), 1e-12)
+        rows = np.round(vectors * scales[:, None]).astype(np.int8)
+
+        self._reserve(len(rows), rows.shape[1])
+        end = self._tail_count + len(rows)
+        self._tail_rows[self._tail_count:end] = rows
+        self._tail_scales[self._tail_count:end] = scales
+        self._tail_count = end
+        for doc_id in ids:
+            # Also covers an id repeated within the batch: the last vector wins
+            self._discard(doc_id)
+            self._positions[doc_id] = len(self.ids)
+            self.ids.append(doc_id)
+        self._compact_if_sparse()
+
+    def remove(self, ids):
+        """Drop the rows stored under ids; unknown ids are ignored."""
+        for doc_id in ids:
+            self._discard(doc_id)
+        self._compact_if_sparse()
+
+    def _discard(self, doc_id):
+        row = self._positions.pop(doc_id, None)
+        if row is not None:
+            self.ids[row] = None
+            self._dead.add(row)
+
+    def _compact_if_sparse(self):
+        if len(self._dead) >= COMPACT_MIN_DEAD and len(self._dead) > len(self._positions):
+            self._compact()
+
+    def save(self, directory):
+        """Write raw int8 rows, float32 scales and a JSON sidecar of the live ids."""
+        os.makedirs(directory, exist_ok=True)
+        dim = next((rows.shape[1] for rows, _ in self._blocks()), 0)
+
+        with _replacing(os.path.join(directory, ROWS_FILE)) as f:
+            for rows, _ in self._live_chunks():
+                rows.tofile(f)
+        with _replacing(os.path.join(directory, SCALES_FILE)) as f:
+            for _, scales in self._live_chunks():
+                scales.tofile(f)
+        # Written last: load() trusts the row files only as far as this says
+        with _replacing(os.path.join(directory, META_FILE), 'w') as f:
+            json.dump({'ids': [doc_id for doc_id in self.ids if doc_id is not None], 'dim': dim}, f)
+
+    @classmethod
+    def load(cls, directory, populate=False):
+        """
+        Open an index written by save() with its rows memory-mapped read-only.
+
+        Rows are paged in on demand and then served from the OS page cache;
+        populate=True prefaults them all up front (MAP_POPULATE, Linux only).
+        Rows added afterwards go to the in-memory tail. Raises ValueError if
+        the row files do not match the sidecar.
+        """
+        with open(os.path.join(directory, META_FILE)) as f:
+            meta = json.load(f)
+
+        index = cls()
+        index.ids = list(meta['ids'])
+        index._positions = {doc_id: row for row, doc_id in enumerate(index.ids)}
+        if len(index._positions) != len(index.ids):
+            raise ValueError(f"{META_FILE} lists an id more than once")
+        if index.ids:
+            shape = (len(index.ids), meta['dim'])
+            rows_path = os.path.join(directory, ROWS_FILE)
+            if os.path.getsize(rows_path) != shape[0] * shape[1]:
+                raise ValueError(f"{rows_path} does not hold {shape[0]} x {shape[1]} rows")
+            scales = np.fromfile(os.path.join(directory, SCALES_FILE), dtype=np.float32)
+            if len(scales) != shape[0]:
+                raise ValueError(f"{SCALES_FILE} does not hold {shape[0]} scales")
+            index._base = _map_rows(rows_path, shape, populate), scales
+        return index
+
+    def search(self, query, k=5):
+        """Return up to k (id, score) pairs for a normalized query, best first."""
+        return self.search_batch(_as_array(query).reshape(1, -1), k)[0]
+
+    def search_batch(self, queries, k=5):
+        """
+        Return up to k (id, score) pairs per normalized query, best first.
+
+        All queries are scored in one [queries x rows] matmul per chunk.
+        """
+        queries = np.atleast_2d(_as_array(queries))
+        k = min(k, len(self))
+        if k <= 0:
+            return [[] for _ in queries]
+
+        scores = np.empty((len(queries), len(self.ids)), dtype=np.float32)
+        scratch = np.empty((SEARCH_CHUNK_ROWS, queries.shape[1]), dtype=np.float32)
+        offset = 0
+        for rows, scales in self._blocks():
+            for start in range(0, len(rows), SEARCH_CHUNK_ROWS):
+                chunk = rows[start:start + SEARCH_CHUNK_ROWS]
+                widened = scratch[:len(chunk)]
+                np.copyto(widened, chunk)
+                columns = slice(offset + start, offset + start + len(chunk))
+                np.matmul(queries, widened.T, out=scores[:, columns])
+            scores[:, offset:offset + len(rows)] /= scales
+            offset += len(rows)
+        if self._dead:
+            scores[:, list(self._dead)] = -np.inf
+
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            candidates = candidates[np.argsort(-row[candidates])]
+            results.append([(self.ids[i], float(row[i])) for i in candidates])
+        return results